@@ -1,5 +1,7 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 import json
 import os
 import time
@@ -19,6 +21,8 @@ if "campaign_running" not in st.session_state:
     st.session_state.campaign_running = False
 if "results" not in st.session_state:
     st.session_state.results = []
+if "log_xlsx" not in st.session_state:
+    st.session_state.log_xlsx = None
 
 # Load message templates [(this is a mock, so we use a local JSON file) later we will use an assitant to generate the templates based on the user profile and interaction]
 @st.cache_data
@@ -36,18 +40,38 @@ def load_templates():
 def load_leads():
     leads_path = "data/leads.csv"
     if os.path.exists(leads_path):
-        return pd.read_csv(leads_path, encoding="utf-8", dtype={"phone": str})
+        # pyarrow's multithreaded CSV reader, straight into pyarrow-backed string columns;
+        # phone is typed up front so "+91..." is never parsed as a number
+        table = pacsv.read_csv(leads_path, convert_options=pacsv.ConvertOptions(column_types={"phone": pa.string()}))
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
     else:
         st.error(f"Leads file not found at {leads_path}")
         return pd.DataFrame()
 
-# Initialize mock API client and Excel logger
-mock_api = MockAPIClient()
-excel_logger = ExcelLogger()
-
-# Start background monitoring if connected
-if mock_api.is_connected:
-    excel_logger.start_status_monitoring(mock_api)
+# Cell colours for the Delivery_Status column of the status table
+STATUS_COLORS = {
+    "sent": "background-color: #d4edda",
+    "failed": "background-color: #f8d7da",
+    "queued": "background-color: #fff3cd",
+}
+MAX_STYLED_ROWS = 500
+
+def color_status(col):
+    # Column-wise: one Series.map over the prebuilt CSS strings instead of a call per cell
+    return col.map(STATUS_COLORS).fillna("")
+
+# Initialize mock API client and logger once per server process; the logger keeps the
+# log in memory, so every rerun has to share the same instance (and monitor thread)
+@st.cache_resource
+def init_services():
+    api = MockAPIClient()
+    logger = ExcelLogger()
+    # Start background monitoring if connected
+    if api.is_connected:
+        logger.start_status_monitoring(api)
+    return api, logger
+
+mock_api, excel_logger = init_services()
 
 # Main UI
 st.title("📱 WhatsApp Campaign Manager (Mock API)")
@@ -113,87 +137,75 @@ with col2:
 
     # Auto‐refresh toggle
     auto_refresh = st.checkbox("Auto‐refresh (every 10 seconds)", value=True)
-
-    # Control buttons: Refresh / Retry / Follow‐up
-    b1, b2, b3 = st.columns(3)
-    with b1:
-        if st.button("🔄 Refresh Status"):
-            st.rerun()
-    with b2:
-        if st.button("🔄 Retry Failed Now"):
-            current_time = datetime.now()
-            excel_logger.retry_failed_messages(mock_api, current_time)
-            st.success("Retry attempt completed!")
-            time.sleep(1)
-            st.rerun()
-    with b3:
-        if st.button("📞 Send Follow‐ups"):
-            current_time = datetime.now()
-            excel_logger.send_followups(mock_api, current_time)
-            st.success("Follow‐up check completed!")
-            time.sleep(1)
-            st.rerun()
-
-    
-
-    # Display current data
-    current_data = excel_logger.get_current_data()
-    if not current_data.empty:
-        # Metrics
-        colm = st.columns(5)
-        with colm[0]:
-            delivered = len(current_data[current_data["Delivery_Status"] == "sent"])
-            st.metric("✅ Delivered", delivered)
-        with colm[1]:
-            failed = len(current_data[current_data["Delivery_Status"] == "failed"])
-            st.metric("❌ Failed", failed)
-        with colm[2]:
-            queued = len(current_data[current_data["Delivery_Status"] == "queued"])
-            st.metric("⏳ Queued", queued)
-        with colm[3]:
-            replied = current_data["Reply_History"].apply(
-                lambda x: len(json.loads(x)) if pd.notna(x) and x != "" else 0
-            ).sum()
-            st.metric("💬 Replies", replied)
-        with colm[4]:
-            followups = len(current_data[current_data["Follow_Up_Status"] == "sent"])
-            st.metric("📞 Follow‐ups Sent", followups)
-
-        st.markdown("### Detailed Status")
-        def highlight_status(row):
-            if row["Delivery_Status"] == "sent":
-                return ["background-color: #d4edda"] * len(row)
-            elif row["Delivery_Status"] == "failed":
-                return ["background-color: #f8d7da"] * len(row)
-            elif row["Delivery_Status"] == "queued":
-                return ["background-color: #fff3cd"] * len(row)
-            else:
-                return [""] * len(row)
-
-        display_cols = [
-            "Name", "Phone", "Delivery_Status", "Reply_History",
-            "Retry_Count", "Follow_Up_Status", "Message_Sent_Time", "Last_Updated"
-        ]
-        available = [c for c in display_cols if c in current_data.columns]
-        disp_df = current_data[available]
-        styled = disp_df.style.apply(highlight_status, axis=1)
-        st.dataframe(styled, use_container_width=True)
-
-        with st.expander("📋 View All Columns"):
-            st.dataframe(current_data, use_container_width=True)
-
-        # Download full log
-        with open(excel_logger.log_file_path, "rb") as f:
-            st.download_button(
-                label="📥 Download Full Log (Excel)",
-                data=f.read(),
-                file_name="delivery_log.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-    else:
-        st.info("No campaign data yet. Send a campaign to see status.")
-
-    # Auto‐refresh
-    if auto_refresh and not st.session_state.campaign_running:
-        time.sleep(10)
-        st.rerun()
+    show_archive = st.checkbox("Include archived messages (last 7 days)", value=False)
+
+    # Only this panel reruns on the timer (and on its own buttons), so the campaign
+    # column and cached leads/templates are left alone between refreshes
+    @st.fragment(run_every=10 if auto_refresh and not st.session_state.campaign_running else None)
+    def status_panel():
+        # Control buttons: Refresh / Retry / Follow‐up (clicking any of them reruns the panel)
+        b1, b2, b3 = st.columns(3)
+        with b1:
+            st.button("🔄 Refresh Status")
+        with b2:
+            if st.button("🔄 Retry Failed Now"):
+                current_time = datetime.now()
+                excel_logger.retry_failed_messages(mock_api, current_time)
+                st.success("Retry attempt completed!")
+        with b3:
+            if st.button("📞 Send Follow‐ups"):
+                current_time = datetime.now()
+                excel_logger.send_followups(mock_api, current_time)
+                st.success("Follow‐up check completed!")
+
+        # Display current data
+        current_data = excel_logger.get_current_data(include_archive=show_archive)
+        if not current_data.empty:
+            # Metrics
+            colm = st.columns(5)
+            status_counts = current_data["Delivery_Status"].value_counts()
+            with colm[0]:
+                delivered = int(status_counts.get("sent", 0))
+                st.metric("✅ Delivered", delivered)
+            with colm[1]:
+                failed = int(status_counts.get("failed", 0))
+                st.metric("❌ Failed", failed)
+            with colm[2]:
+                queued = int(status_counts.get("queued", 0))
+                st.metric("⏳ Queued", queued)
+            with colm[3]:
+                replied = int(current_data["Reply_Count"].sum())
+                st.metric("💬 Replies", replied)
+            with colm[4]:
+                followups = int((current_data["Follow_Up_Status"] == "sent").sum())
+                st.metric("📞 Follow‐ups Sent", followups)
+
+            st.markdown("### Detailed Status")
+            display_cols = [
+                "Name", "Phone", "Delivery_Status", "Reply_History",
+                "Retry_Count", "Follow_Up_Status", "Message_Sent_Time", "Last_Updated"
+            ]
+            available = [c for c in display_cols if c in current_data.columns]
+            # Only the most recent rows are styled; the expander below still has everything
+            disp_df = current_data[available].tail(MAX_STYLED_ROWS)
+            st.dataframe(disp_df.style.apply(color_status, subset=["Delivery_Status"]), use_container_width=True)
+            if len(current_data) > MAX_STYLED_ROWS:
+                st.caption(f"Showing the latest {MAX_STYLED_ROWS} of {len(current_data)} messages.")
+
+            with st.expander("📋 View All Columns"):
+                st.dataframe(current_data, use_container_width=True)
+
+            # Download full log (the workbook is only built when asked for, not on every rerun)
+            if st.button("📦 Prepare Excel Download"):
+                st.session_state.log_xlsx = excel_logger.to_excel_bytes()
+            if st.session_state.log_xlsx:
+                st.download_button(
+                    label="📥 Download Full Log (Excel)",
+                    data=st.session_state.log_xlsx,
+                    file_name="delivery_log.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+        else:
+            st.info("No campaign data yet. Send a campaign to see status.")
+
+    status_panel()
@@ -1,99 +1,374 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
-import json
+import orjson
 import threading
 import time
 import tempfile
+import atexit
+from io import BytesIO
 from datetime import datetime, timedelta
 
+ARCHIVE_AFTER = timedelta(hours=24)  # finished rows untouched this long leave the active log
+# Stored as datetime64[ns] so time filters are plain vectorized comparisons
+TIME_COLUMNS = ["Message_Sent_Time", "Last_Updated", "Next_Retry_Time", "Follow_Up_Sent_Time"]
+
+
+def _now(current_time=None):
+    # Log timestamps keep whole-second precision, like the old string format
+    return pd.Timestamp(current_time or datetime.now()).floor("s")
+
+
+def _to_wal(value):
+    # Plain JSON values for a WAL record: timestamps as ISO strings, missing values as null
+    if isinstance(value, (list, tuple, np.ndarray, pd.Index, pd.Series)):
+        return [_to_wal(v) for v in value]
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _to_wal_values(values):
+    return {col: _to_wal(v) for col, v in values.items()}
+
+
+def _from_wal_time(value):
+    if isinstance(value, list):
+        return pd.to_datetime(pd.Series(value, dtype="object"), errors="coerce").tolist()
+    return pd.Timestamp(value) if value is not None else pd.NaT
+
+
 class ExcelLogger:
-    def __init__(self, log_file_path="data/delivery_log.xlsx"):
+    def __init__(self, log_file_path="data/delivery_log.parquet", compact_interval=30):
         self.log_file_path = log_file_path
+        self.archive_dir = os.path.join(os.path.dirname(log_file_path), "archive")
+        # Every mutation is appended to the write-ahead log; the parquet file is only rewritten
+        # (and the WAL truncated) by the compactor every compact_interval seconds
+        self.wal_path = os.path.splitext(log_file_path)[0] + ".wal"
+        self.compact_interval = compact_interval
         self.lock = threading.Lock()
+        self._retry_lock = threading.Lock()
+        # In-memory copy of the log is the source of truth
+        self._df = None
+        self._dirty = False
+        self._seq = 0  # last WAL record applied; stored in the parquet metadata on compaction
+        # Message_ID -> row position and column name -> column position, so updates skip mask scans
+        self._id_to_idx = {}
+        self._col_pos = {}
         self._create_if_missing()
+        # The only disk read: everything after this works on the cached frame
+        with self.lock:
+            self._safe_read()
+        self._wal = open(self.wal_path, "ab")
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.flush)
 
     def _create_if_missing(self):
 
         if not os.path.exists(self.log_file_path):
             os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
-            # Create DataFrame with correct columns and string dtypes for time columns (hardcoded now, later we can use a config)
-            # Note: We use pd.Series(dtype="object") to ensure empty columns are created with object dtype
+            # Create DataFrame with correct columns and dtypes (hardcoded now, later we can use a config)
+            # Note: time columns are datetime64 so comparisons never have to parse strings
             df = pd.DataFrame({
                 "Name": pd.Series(dtype="object"),
                 "Phone": pd.Series(dtype="object"),
                 "Message": pd.Series(dtype="object"),
-                "Message_Sent_Time": pd.Series(dtype="object"),
+                "Message_Sent_Time": pd.Series(dtype="datetime64[ns]"),
                 "Delivery_Status": pd.Series(dtype="object"),
                 "Message_ID": pd.Series(dtype="object"),
-                "Last_Updated": pd.Series(dtype="object"),
+                "Last_Updated": pd.Series(dtype="datetime64[ns]"),
                 "Retry_Count": pd.Series(dtype="Int64"),
-                "Next_Retry_Time": pd.Series(dtype="object"),
+                "Next_Retry_Time": pd.Series(dtype="datetime64[ns]"),
                 "Follow_Up_Status": pd.Series(dtype="object"),
-                "Follow_Up_Sent_Time": pd.Series(dtype="object"),
+                "Follow_Up_Sent_Time": pd.Series(dtype="datetime64[ns]"),
                 "Followup_Message": pd.Series(dtype="object"),   
-                "Reply_History": pd.Series(dtype="object")
+                "Reply_History": pd.Series(dtype="object"),
+                "Reply_Count": pd.Series(dtype="Int64"),
+                "Has_Reply": pd.Series(dtype="bool")
             })
-            self._atomic_write(df)
+            df = self._import_legacy_excel(df)
+            # A WAL left behind by the log that is gone would replay onto the new rows'
+            # positions (and reuse its sequence numbers), so a new log starts with no WAL
+            if os.path.exists(self.wal_path):
+                os.remove(self.wal_path)
+            self._write_to_disk(df, seq=self._seq)
+            self._df = df
+            self._build_index(df)
+
+    def _import_legacy_excel(self, empty_df: pd.DataFrame):
+
+        # Installs that logged to delivery_log.xlsx carry their rows over once, when the
+        # parquet log is first created; the xlsx itself is left untouched
+        legacy_path = os.path.splitext(self.log_file_path)[0] + ".xlsx"
+        if not os.path.exists(legacy_path):
+            return empty_df
+        try:
+            legacy = self._upgrade_columns(pd.read_excel(legacy_path, engine="openpyxl", dtype={"Phone": str}))
+        except Exception as e:
+            print(f"Error importing legacy Excel log {legacy_path}: {e}")
+            return empty_df
+        df = pd.concat([empty_df, legacy[[c for c in empty_df.columns if c in legacy.columns]]], ignore_index=True)
+        df["Retry_Count"] = df["Retry_Count"].fillna(0).astype("Int64")
+        df["Has_Reply"] = df["Has_Reply"].fillna(False).astype(bool)
+        print(f"Imported {len(df)} rows from {legacy_path}")
+        return df
 
-    def _safe_read(self, retries=3, wait=0.5):
+    def _safe_read(self, retries=3, wait=0.5, snapshot=False):
+
+        # Callers hold self.lock and get the live frame; snapshot=True is for readers outside the lock
+        if self._df is not None:
+            return self._df.copy() if snapshot else self._df
 
         for attempt in range(1, retries + 1):
             try:
-                df = pd.read_excel(self.log_file_path, engine="openpyxl")
-                return df
+                table = pq.read_table(self.log_file_path)
+                seq = int((table.schema.metadata or {}).get(b"wal_seq", b"0"))
+                df = self._upgrade_columns(table.to_pandas())
+                self._df = self._replay_wal(df, seq)
+                self._build_index(self._df)
+                return self._df
             except Exception as e:
-                print(f"Error reading Excel file (attempt {attempt}/{retries}): {e}")
+                print(f"Error reading log file (attempt {attempt}/{retries}): {e}")
                 time.sleep(wait)
         return None
 
-    def _atomic_write(self, df: pd.DataFrame):
+    def _upgrade_columns(self, df: pd.DataFrame):
+
+        # Older logs stored timestamps as "%Y-%m-%d %H:%M:%S" strings
+        for col in TIME_COLUMNS:
+            if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors="coerce")
 
-        temp_fd, temp_path = tempfile.mkstemp(suffix=".xlsx")
+        # Logs written before Reply_Count existed get it backfilled from Reply_History once
+        if "Reply_Count" not in df.columns and "Reply_History" in df.columns:
+            def count(hist):
+                try:
+                    return len(orjson.loads(hist)) if (pd.notna(hist) and hist != "") else 0
+                except:
+                    return 0
+            df["Reply_Count"] = df["Reply_History"].apply(count).astype("Int64")
+        if "Has_Reply" not in df.columns and "Reply_Count" in df.columns:
+            df["Has_Reply"] = (df["Reply_Count"].fillna(0) > 0).astype(bool)
+        return df
+
+    def _build_index(self, df: pd.DataFrame):
+
+        self._col_pos = {c: i for i, c in enumerate(df.columns)}
+        self._id_to_idx = {}
+        if "Message_ID" in df.columns:
+            # Later rows win, matching the old "last matching row" behaviour
+            for i, mid in enumerate(df["Message_ID"]):
+                if pd.notna(mid) and mid != "":
+                    self._id_to_idx[mid] = i
+
+    def _log_op(self, record):
+
+        # O(1) per mutation: one JSON line appended to the WAL (left in the OS cache, no fsync)
+        self._seq += 1
+        record["seq"] = self._seq
+        self._wal.write(orjson.dumps(record) + b"\n")
+        self._wal.flush()
+        self._dirty = True
+
+    def _apply_op(self, df: pd.DataFrame, record):
+
+        # Replays one WAL record; the ops mirror what the mutators did to the cached frame
+        op = record["op"]
+        if op == "append":
+            new_df = pd.DataFrame(record["rows"])
+            for col in TIME_COLUMNS:
+                new_df[col] = pd.to_datetime(new_df[col], errors="coerce")
+            df = pd.concat([df, new_df], ignore_index=True)
+        elif op == "set":
+            for col, value in record["values"].items():
+                df.loc[record["rows"], col] = _from_wal_time(value) if col in TIME_COLUMNS else value
+        elif op == "drop":
+            df = df.drop(index=record["rows"]).reset_index(drop=True)
+        return df
+
+    def _replay_wal(self, df: pd.DataFrame, seq):
+
+        # Records at or below seq are already in the parquet file (a crash can land between
+        # compaction and truncating the WAL); a torn last line ends the replay
+        self._seq = seq
+        if not os.path.exists(self.wal_path):
+            return df
+        with open(self.wal_path, "r+b") as f:
+            good_end = 0
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    # A record is only complete once its newline made it to disk
+                    if not line.endswith(b"\n"):
+                        raise ValueError("missing newline")
+                    record = orjson.loads(line)
+                except ValueError:
+                    # Cut the torn bytes off, or the next appended record would be glued onto
+                    # them and every record after it lost on the following restart
+                    print("Dropping truncated WAL record.")
+                    f.truncate(good_end)
+                    break
+                good_end = f.tell()
+                if record["seq"] <= seq:
+                    continue
+                df = self._apply_op(df, record)
+                self._seq = record["seq"]
+                self._dirty = True
+        return df
+
+    def _write_to_disk(self, df: pd.DataFrame, path=None, seq=None):
+
+        path = path or self.log_file_path
+        # Temp file lives next to the target so os.replace never crosses filesystems
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".parquet", dir=os.path.dirname(path) or ".")
         os.close(temp_fd)
         try:
-            # Use pandas to_excel to write to temp_path
-            df.to_excel(temp_path, index=False)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if seq is not None:
+                table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"wal_seq": str(seq).encode()})
+            pq.write_table(table, temp_path, compression="zstd")
             # Replace the original file (atomic on most OSes)
-            os.replace(temp_path, self.log_file_path)
+            os.replace(temp_path, path)
+            return True
         except Exception as e:
-            print(f"Error writing Excel file atomically: {e}")
+            print(f"Error writing log file atomically: {e}")
             # Cleanup temp file if something went wrong
             try:
                 os.remove(temp_path)
             except:
                 pass
+            return False
+
+    def flush(self):
+
+        # Compaction: write the cached frame (tagged with the last applied seq), then empty the WAL
+        with self.lock:
+            if self._dirty and self._df is not None and self._write_to_disk(self._df, seq=self._seq):
+                self._wal.truncate(0)
+                self._dirty = False
+
+    def _flush_loop(self):
+
+        while True:
+            time.sleep(self.compact_interval)
+            self.flush()
+
+    def archive_old_rows(self, current_time):
+
+        # Move finished rows into data/archive/YYYYMMDD.parquet (by send date) so the active
+        # log, and every write of it, stays bounded by recent/actionable messages
+        with self.lock:
+            df = self._safe_read()
+            if df is None or df.empty or not {"Last_Updated", "Follow_Up_Status"}.issubset(df.columns):
+                return 0
+
+            last_updated = df["Last_Updated"]
+            retries_done = (df["Delivery_Status"] == "failed") & (df["Retry_Count"] >= 5)
+            finished = (df["Follow_Up_Status"] != "pending") | retries_done
+            old = finished & ((current_time - last_updated) > ARCHIVE_AFTER)
+            if not old.any():
+                return 0
+
+            moving = df[old]
+            sent_day = moving["Message_Sent_Time"].dt.strftime("%Y%m%d")
+            sent_day = sent_day.fillna(current_time.strftime("%Y%m%d"))
+            os.makedirs(self.archive_dir, exist_ok=True)
+            for day, rows in moving.groupby(sent_day):
+                path = os.path.join(self.archive_dir, f"{day}.parquet")
+                if os.path.exists(path):
+                    # A crash between archiving and logging the drop can archive a row twice
+                    rows = pd.concat([pd.read_parquet(path, engine="pyarrow"), rows], ignore_index=True)
+                    rows = rows[~(rows.duplicated(subset="Message_ID", keep="last") & rows["Message_ID"].notna())]
+                if not self._write_to_disk(rows, path):
+                    return 0
+
+            active = df[~old].reset_index(drop=True)
+            self._build_index(active)
+            self._df = active
+            self._log_op({"op": "drop", "rows": _to_wal(df.index[old])})
+            return int(old.sum())
+
+    def _read_archive(self, days=7):
+
+        if not os.path.isdir(self.archive_dir):
+            return []
+        # Files are named by send date (YYYYMMDD), so the window is a plain string comparison;
+        # days=None reads the whole archive
+        cutoff = "" if days is None else (datetime.now() - timedelta(days=days)).strftime("%Y%m%d")
+        names = sorted(
+            n for n in os.listdir(self.archive_dir)
+            if n.endswith(".parquet") and os.path.splitext(n)[0] >= cutoff
+        )
+        frames = []
+        for name in names:
+            try:
+                frames.append(pd.read_parquet(os.path.join(self.archive_dir, name), engine="pyarrow"))
+            except Exception as e:
+                print(f"Error reading archive {name}: {e}")
+        return frames
+
+    def to_excel_bytes(self):
+
+        # Excel is only an export format now, built on demand for downloads; it is the full
+        # audit trail, so every archive file goes in regardless of the dashboard's window
+        buf = BytesIO()
+        # strings_to_urls off: xlsxwriter otherwise regex-checks every string cell for a URL
+        with pd.ExcelWriter(buf, engine="xlsxwriter", engine_kwargs={"options": {"strings_to_urls": False}}) as writer:
+            self.get_current_data(include_archive=True, archive_days=None).to_excel(writer, index=False)
+        return buf.getvalue()
 
     def log_message_batch(self, results):
        
+        if not results:
+            return True
         with self.lock:
-            self._create_if_missing()
             existing_df = self._safe_read()
             if existing_df is None:
                 print("Skipping log_message_batch; log file unreadable.")
                 return False
 
+            now = _now()
             log_data = []
             for r in results:
                 entry = {
                     "Name": r.get("name", ""),
                     "Phone": r.get("phone", ""),
                     "Message": r.get("message", ""),
-                    "Message_Sent_Time": r.get("timestamp", ""),
+                    "Message_Sent_Time": pd.to_datetime(r.get("timestamp"), errors="coerce"),
                     "Delivery_Status": r.get("status", "unknown"),
                     "Message_ID": r.get("message_id", ""),
-                    "Last_Updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "Last_Updated": now,
                     "Retry_Count": 0,
-                    "Next_Retry_Time": "",
+                    "Next_Retry_Time": pd.NaT,
                     "Follow_Up_Status": "pending",
-                    "Follow_Up_Sent_Time": "",
+                    "Follow_Up_Sent_Time": pd.NaT,
                     "Followup_Message": "",           # blank for now
-                    "Reply_History": json.dumps([]),
+                    "Reply_History": orjson.dumps([]).decode(),
+                    "Reply_Count": 0,
+                    "Has_Reply": False,
                 }
                 log_data.append(entry)
 
             new_df = pd.DataFrame(log_data)
+            new_df[TIME_COLUMNS] = new_df[TIME_COLUMNS].astype("datetime64[ns]")
             combined = pd.concat([existing_df, new_df], ignore_index=True)
-            self._atomic_write(combined)
+            self._col_pos = {c: i for i, c in enumerate(combined.columns)}
+            for i, entry in enumerate(log_data, start=len(existing_df)):
+                mid = entry["Message_ID"]
+                if pd.notna(mid) and mid != "":
+                    self._id_to_idx[mid] = i
+            self._df = combined
+            self._log_op({"op": "append", "rows": [_to_wal_values(e) for e in log_data]})
             return True
 
     def update_delivery_status(self, message_id, new_status):
@@ -107,20 +382,32 @@ class ExcelLogger:
             if "Message_ID" not in df.columns or "Delivery_Status" not in df.columns:
                 return False
 
-            mask = df["Message_ID"] == message_id
-            if not mask.any():
+            idx = self._id_to_idx.get(message_id)
+            if idx is None:
                 return False
 
-            idx = df[mask].index[-1]
-            df.at[idx, "Delivery_Status"] = new_status
-            df.at[idx, "Last_Updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self._atomic_write(df)
+            pos = self._col_pos
+            now = _now()
+            df.iat[idx, pos["Delivery_Status"]] = new_status
+            df.iat[idx, pos["Last_Updated"]] = now
+            self._log_op({"op": "set", "rows": [idx], "values": {
+                "Delivery_Status": new_status, "Last_Updated": _to_wal(now),
+            }})
             return True
 
-    def get_current_data(self):
+    def get_current_data(self, include_archive=False, archive_days=7):
         
-        df = self._safe_read()
-        return df if df is not None else pd.DataFrame()
+        with self.lock:
+            # Hand out a copy so the UI never sees a frame mid-mutation
+            df = self._safe_read(snapshot=True)
+        if df is None:
+            df = pd.DataFrame()
+        if include_archive:
+            # Only on request: archived rows are read from disk every time
+            archived = self._read_archive(archive_days)
+            if archived:
+                df = pd.concat([*archived, df], ignore_index=True)
+        return df
 
     def update_reply_status(self, message_id, reply_text, reply_timestamp):
       
@@ -133,50 +420,126 @@ class ExcelLogger:
             if "Message_ID" not in df.columns or "Reply_History" not in df.columns:
                 return False
 
-            mask = df["Message_ID"] == message_id
-            if not mask.any():
+            idx = self._id_to_idx.get(message_id)
+            if idx is None:
                 return False
 
-            idx = df[mask].index[-1]
-            history = df.at[idx, "Reply_History"]
+            pos = self._col_pos
+            history = df.iat[idx, pos["Reply_History"]]
             try:
-                hist_list = json.loads(history) if (pd.notna(history) and history != "") else []
+                hist_list = orjson.loads(history) if (pd.notna(history) and history != "") else []
             except:
                 hist_list = []
 
             hist_list.append({"text": reply_text, "timestamp": reply_timestamp})
-            df.at[idx, "Reply_History"] = json.dumps(hist_list)
-            df.at[idx, "Delivery_Status"] = "success"
-            df.at[idx, "Follow_Up_Status"] = "not_required"
-            df.at[idx, "Last_Updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self._atomic_write(df)
+            values = {
+                "Reply_History": orjson.dumps(hist_list).decode(),
+                "Reply_Count": len(hist_list),
+                "Has_Reply": True,
+                "Delivery_Status": "success",
+                "Follow_Up_Status": "not_required",
+                "Last_Updated": _now(),
+            }
+            for col, value in values.items():
+                df.iat[idx, pos[col]] = value
+            self._log_op({"op": "set", "rows": [idx], "values": _to_wal_values(values)})
             return True
 
     def retry_failed_messages(self, api_client, current_time):
    
-        with self.lock:
-            df = self._safe_read()
-            if df is None:
-                print("Skipping retry_failed_messages; log file unreadable.")
-                return
-
-            if not {"Delivery_Status", "Retry_Count", "Next_Retry_Time"}.issubset(df.columns):
-                return
-
-            mask = (df["Delivery_Status"] == "failed") & (df["Retry_Count"] < 5)
-            for idx, row in df[mask].iterrows():
-                nxt_rt = row["Next_Retry_Time"]
-                if pd.isna(nxt_rt) or pd.to_datetime(nxt_rt) <= current_time:
-                    res = api_client.send_message(row["Phone"], row["Message"])
-                    df.at[idx, "Delivery_Status"] = res.get("status", "failed")
-                    df.at[idx, "Message_ID"] = res.get("message_id", "")
-                    df.at[idx, "Retry_Count"] = row["Retry_Count"] + 1
-                    df.at[idx, "Last_Updated"] = current_time.strftime("%Y-%m-%d %H:%M:%S")
-                    nxt_time = current_time + pd.Timedelta(minutes=1)
-                    df.at[idx, "Next_Retry_Time"] = nxt_time.strftime("%Y-%m-%d %H:%M:%S")
-                    print(f"Retry {row['Retry_Count'] + 1} for {row['Name']}: {res.get('status')}")
-
-            self._atomic_write(df)
+        # One retry pass at a time (monitor vs. the dashboard button), or both would resend the same rows
+        with self._retry_lock:
+            with self.lock:
+                df = self._safe_read()
+                if df is None:
+                    print("Skipping retry_failed_messages; log file unreadable.")
+                    return
+
+                if not {"Delivery_Status", "Retry_Count", "Next_Retry_Time"}.issubset(df.columns):
+                    return
+
+                mask = (df["Delivery_Status"] == "failed") & (df["Retry_Count"] < 5)
+                nxt_rt = df["Next_Retry_Time"]
+                due_idx = df.index[mask & (nxt_rt.isna() | (nxt_rt <= current_time))]
+                if len(due_idx) == 0:
+                    return
+                due_rows = df.loc[due_idx, ["Name", "Phone", "Message", "Retry_Count", "Message_ID"]].copy()
+
+            # The sends run concurrently and without self.lock, so status updates aren't held up
+            results = api_client.send_messages(due_rows["Phone"].tolist(), due_rows["Message"].tolist())
+
+            with self.lock:
+                df = self._safe_read()
+                pos = self._col_pos
+
+                # Rows can move (archiving) or change while unlocked: find each one again and only
+                # keep it if it is still the same failed attempt. Rows without a Message_ID are
+                # matched on their content too, since every never-sent failure looks alike otherwise
+                def blank(mid):
+                    return not (pd.notna(mid) and mid != "")
+
+                def same(a, b):
+                    return (pd.isna(a) and pd.isna(b)) or a == b
+
+                def still_due(cur, name, phone, message, retries, old_mid):
+                    if not 0 <= cur < len(df) or cur in claimed:
+                        return False
+                    cur_mid = df.iat[cur, pos["Message_ID"]]
+                    same_mid = blank(cur_mid) if blank(old_mid) else cur_mid == old_mid
+                    return (same_mid and df.iat[cur, pos["Delivery_Status"]] == "failed"
+                            and df.iat[cur, pos["Retry_Count"]] == retries
+                            and same(df.iat[cur, pos["Name"]], name)
+                            and same(df.iat[cur, pos["Phone"]], phone)
+                            and same(df.iat[cur, pos["Message"]], message))
+
+                rows, new_status, new_mid, new_retries = [], [], [], []
+                claimed = set()
+                for idx, row, res in zip(due_idx, due_rows.itertuples(index=False), results):
+                    name, phone, message, retries, old_mid = row
+                    cur = idx if blank(old_mid) else self._id_to_idx.get(old_mid, -1)
+                    if not still_due(cur, *row):
+                        if not blank(old_mid):
+                            continue
+                        # The row shifted: look for it (rare, so a scan is fine)
+                        maybe = (df["Delivery_Status"] == "failed") & (df["Retry_Count"] == retries)
+                        candidates = [c for c in df.index[maybe] if still_due(c, *row)]
+                        if not candidates:
+                            continue
+                        cur = candidates[0]
+                    claimed.add(cur)
+                    rows.append(cur)
+                    new_status.append(res.get("status", "failed"))
+                    new_mid.append(res.get("message_id", ""))
+                    new_retries.append(retries + 1)
+                    print(f"Retry {retries + 1} for {name}: {res.get('status')}")
+                if not rows:
+                    return
+
+                now = _now(current_time)
+                nxt_time = now + pd.Timedelta(minutes=1)
+                # Retried rows get a fresh Message_ID; repoint the index at it
+                for idx, old_mid, mid in zip(rows, df.loc[rows, "Message_ID"], new_mid):
+                    if self._id_to_idx.get(old_mid) == idx:
+                        del self._id_to_idx[old_mid]
+                    if pd.notna(mid) and mid != "":
+                        self._id_to_idx[mid] = idx
+                # Write every result back in one assignment
+                cols = ["Delivery_Status", "Message_ID", "Retry_Count", "Last_Updated", "Next_Retry_Time"]
+                df.loc[rows, cols] = pd.DataFrame({
+                    "Delivery_Status": new_status,
+                    "Message_ID": new_mid,
+                    "Retry_Count": pd.array(new_retries, dtype="Int64"),
+                    "Last_Updated": now,
+                    "Next_Retry_Time": nxt_time,
+                }, index=rows)
+
+                self._log_op({"op": "set", "rows": rows, "values": _to_wal_values({
+                    "Delivery_Status": new_status,
+                    "Message_ID": new_mid,
+                    "Retry_Count": new_retries,
+                    "Last_Updated": now,
+                    "Next_Retry_Time": nxt_time,
+                })})
 
     def send_followups(self, api_client, current_time):
       
@@ -186,38 +549,63 @@ class ExcelLogger:
                 print("Skipping send_followups; log file unreadable.")
                 return
 
-            required = {"Delivery_Status", "Reply_History", "Follow_Up_Status", "Message_Sent_Time"}
+            required = {"Delivery_Status", "Has_Reply", "Follow_Up_Status", "Message_Sent_Time"}
             if not required.issubset(df.columns):
                 return
 
-            def no_replies(hist):
-                if pd.isna(hist) or hist == "":
-                    return True
-                try:
-                    return len(json.loads(hist)) == 0
-                except:
-                    return True
-
             mask = (
                 (df["Delivery_Status"] == "sent")
-                & df["Reply_History"].apply(no_replies)
+                & ~df["Has_Reply"]
                 & (df["Follow_Up_Status"] == "pending")
             )
 
-            for idx, row in df[mask].iterrows():
-                sent_time = pd.to_datetime(row["Message_Sent_Time"])
-                if (current_time - sent_time).total_seconds() >= 10 * 60:
-                    name = row["Name"]
-                    followup_msg = f"Hi {name}, just a quick follow-up—any questions about our program?"
-
-                    res = api_client.send_message(row["Phone"], followup_msg)
-                    df.at[idx, "Follow_Up_Status"] = "sent" if res.get("status") in ("queued", "sent") else "failed"
-                    df.at[idx, "Follow_Up_Sent_Time"] = current_time.strftime("%Y-%m-%d %H:%M:%S")
-                    df.at[idx, "Followup_Message"] = followup_msg
-                    df.at[idx, "Last_Updated"] = current_time.strftime("%Y-%m-%d %H:%M:%S")
-                    print(f"Follow-up sent to {row['Name']}: {res.get('status')}")
+            sent_time = df["Message_Sent_Time"]
+            mask &= (current_time - sent_time).dt.total_seconds() >= 10 * 60
+            if not mask.any():
+                return
 
-            self._atomic_write(df)
+            followup_msgs, followup_status = [], []
+            for name, phone in df.loc[mask, ["Name", "Phone"]].itertuples(index=False):
+                followup_msg = f"Hi {name}, just a quick follow-up—any questions about our program?"
+                res = api_client.send_message(phone, followup_msg)
+                followup_msgs.append(followup_msg)
+                followup_status.append("sent" if res.get("status") in ("queued", "sent") else "failed")
+                print(f"Follow-up sent to {name}: {res.get('status')}")
+
+            now = _now(current_time)
+            df.loc[mask, "Follow_Up_Status"] = followup_status
+            df.loc[mask, "Follow_Up_Sent_Time"] = now
+            df.loc[mask, "Followup_Message"] = followup_msgs
+            df.loc[mask, "Last_Updated"] = now
+
+            self._log_op({"op": "set", "rows": _to_wal(df.index[mask]), "values": _to_wal_values({
+                "Follow_Up_Status": followup_status,
+                "Follow_Up_Sent_Time": now,
+                "Followup_Message": followup_msgs,
+                "Last_Updated": now,
+            })})
+
+    def _monitor_targets(self, df, current_time):
+
+        # Message_IDs still queued, and sent ones with no reply yet that are under an hour old
+        if "Delivery_Status" not in df.columns or "Message_ID" not in df.columns:
+            return [], []
+
+        mids = df["Message_ID"]
+        has_mid = mids.notna() & (mids != "")
+        queued_ids = mids[has_mid & (df["Delivery_Status"] == "queued")].tolist()
+
+        reply_ids = []
+        if "Has_Reply" in df.columns:
+            sent_time = df["Message_Sent_Time"]
+            awaiting = (
+                has_mid
+                & (df["Delivery_Status"] == "sent")
+                & ~df["Has_Reply"]
+                & ((current_time - sent_time) <= timedelta(hours=1))
+            )
+            reply_ids = mids[awaiting].tolist()
+        return queued_ids, reply_ids
 
     def start_status_monitoring(self, api_client, check_interval=30):
       
@@ -225,42 +613,39 @@ class ExcelLogger:
         def monitor():
             while True:
                 try:
-                    df = self._safe_read()
-                    if df is None:
-                        time.sleep(check_interval)
-                        continue
-
                     current_time = datetime.now()
 
+                    # Pick this tick's work from the shared frame in one pass under the lock,
+                    # instead of copying the whole log; the API calls then run without it
+                    with self.lock:
+                        df = self._safe_read()
+                        if df is None or df.empty:
+                            queued_ids, reply_ids = [], []
+                        else:
+                            queued_ids, reply_ids = self._monitor_targets(df, current_time)
+
+                    # Fetch every status and reply for this tick concurrently
+                    statuses, replies = api_client.poll(queued_ids, reply_ids)
+
                     # 1. Update status for queued messages
-                    if "Delivery_Status" in df.columns and "Message_ID" in df.columns:
-                        queued_mask = df["Delivery_Status"] == "queued"
-                        for _, row in df[queued_mask].iterrows():
-                            mid = row["Message_ID"]
-                            if pd.notna(mid) and mid != "":
-                                status = api_client.get_message_status(mid)
-                                if status != row["Delivery_Status"]:
-                                    self.update_delivery_status(mid, status)
+                    for mid, status in statuses.items():
+                        if status != "queued":
+                            self.update_delivery_status(mid, status)
 
                     # 2. Retry failed messages
                     self.retry_failed_messages(api_client, current_time)
 
                     # 3. Check for replies (only within 1 hour)
-                    if "Delivery_Status" in df.columns and "Message_ID" in df.columns and "Reply_History" in df.columns:
-                        sent_mask = df["Delivery_Status"] == "sent"
-                        for _, row in df[sent_mask].iterrows():
-                            mid = row["Message_ID"]
-                            hist = row["Reply_History"]
-                            if pd.isna(hist) or hist == "[]":
-                                sent_time = pd.to_datetime(row["Message_Sent_Time"])
-                                if (current_time - sent_time) <= timedelta(hours=1):
-                                    reply_data = api_client.get_reply(mid)
-                                    if reply_data.get("reply"):
-                                        self.update_reply_status(mid, reply_data["reply"], reply_data["timestamp"])
+                    for mid, reply_data in replies.items():
+                        if reply_data.get("reply"):
+                            self.update_reply_status(mid, reply_data["reply"], reply_data["timestamp"])
 
                     # 4. Send follow-ups (after 10 minutes)
                     self.send_followups(api_client, current_time)
 
+                    # 5. Move finished rows older than a day out of the active log
+                    self.archive_old_rows(current_time)
+
                 except Exception as e:
                     print(f"Error in status monitoring: {e}")
 
@@ -1,32 +1,75 @@
 import os
 import time
 import logging
+import random
+import asyncio
+import threading
+import httpx
 import requests
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional
 
 MOCK_API_BASE = os.getenv("MOCK_API_BASE", "http://localhost:8000") 
+BULK_CHUNK_SIZE = 200  # IDs per bulk request when the monitor polls asynchronously
+
+
+# Token bucket shared by the send workers: `rate` tokens per second, bursts up to `burst`
+class RateLimiter:
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 
 class MockAPIClient:
-    def __init__(self):
+    def __init__(self, max_workers: int = 16, rate_limit: Optional[float] = None):
         self.base_url = MOCK_API_BASE.rstrip("/")
+        self.max_workers = max_workers
+        # Optional messages-per-second cap for bulk sends (None = as fast as the server allows)
+        self.rate_limiter = RateLimiter(rate_limit, burst=max_workers) if rate_limit else None
+        # One pooled session so every call reuses open connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         try:
             # Quick check of server: expect 404 for invalid ID 
-            resp = requests.get(f"{self.base_url}/mock/status/invalid_id", timeout=2)
+            resp = self.session.get(f"{self.base_url}/mock/status/invalid_id", timeout=2)
             self.is_connected = (resp.status_code == 404)
         except Exception as e:
             logging.error(f"Failed to reach mock API server: {e}")
             self.is_connected = False
 
+    def _send_payload(self, to_phone: str, message: str) -> Dict:
+        to_str = str(to_phone)
+        if not to_str.startswith("+"):
+            to_str = "+" + to_str # I did this check because during the initial testing, the phone numbers were not in the correct format
+
+        payload = {"to": to_str, "body": message}
+        print("DEBUG: JSON payload →", payload)
+        return payload
+
     def send_message(self, to_phone: str, message: str) -> Dict:
  
         try:
-            to_str = str(to_phone)
-            if not to_str.startswith("+"):
-                to_str = "+" + to_str # I did this check because during the initial testing, the phone numbers were not in the correct format
-
-            payload = {"to": to_str, "body": message}
-            print("DEBUG: JSON payload →", payload)
-            r = requests.post(f"{self.base_url}/mock/send", json=payload, timeout=5)
+            payload = self._send_payload(to_phone, message)
+            r = self.session.post(f"{self.base_url}/mock/send", json=payload, timeout=5)
             r.raise_for_status()
             data = r.json()
             return {
@@ -44,9 +87,42 @@ class MockAPIClient:
             logging.error(f"MockAPI error sending to {to_phone}: {e}")
             return {"status": "failed", "message_id": None, "error": str(e)}
 
+    async def _send_message_async(self, client: httpx.AsyncClient, sem: asyncio.Semaphore, to_phone: str, message: str) -> Dict:
+        # Same result shape and error handling as send_message
+        try:
+            async with sem:
+                r = await client.post("/mock/send", json=self._send_payload(to_phone, message))
+            if r.status_code == 422:
+                logging.error(f"Malformed payload for {to_phone}: {r.text}")
+                return {"status": "invalid_payload", "message_id": None, "error": r.text}
+            r.raise_for_status()
+            data = r.json()
+            return {
+                "status": data.get("status", "queued"),
+                "message_id": data.get("message_id"),
+                "error": None
+            }
+        except Exception as e:
+            logging.error(f"MockAPI error sending to {to_phone}: {e}")
+            return {"status": "failed", "message_id": None, "error": str(e)}
+
+    async def _send_messages_async(self, phones: List[str], messages: List[str]) -> List[Dict]:
+        sem = asyncio.Semaphore(self.max_workers)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=5) as client:
+            return await asyncio.gather(*(
+                self._send_message_async(client, sem, phone, message)
+                for phone, message in zip(phones, messages)
+            ))
+
+    def send_messages(self, phones: List[str], messages: List[str]) -> List[Dict]:
+        # Sends many messages at once (at most max_workers in flight); results keep input order
+        if not phones:
+            return []
+        return asyncio.run(self._send_messages_async(phones, messages))
+
     def get_message_status(self, message_id: str) -> str:
         try:
-            r = requests.get(f"{self.base_url}/mock/status/{message_id}", timeout=5)
+            r = self.session.get(f"{self.base_url}/mock/status/{message_id}", timeout=5)
             r.raise_for_status()
             return r.json().get("status", "unknown")
         except Exception as e:
@@ -55,7 +131,7 @@ class MockAPIClient:
 
     def get_reply(self, message_id: str) -> Dict:
         try:
-            r = requests.get(f"{self.base_url}/mock/reply/{message_id}", timeout=5)
+            r = self.session.get(f"{self.base_url}/mock/reply/{message_id}", timeout=5)
             r.raise_for_status()
             data = r.json()
             return {"reply": data.get("reply"), "timestamp": data.get("timestamp")}
@@ -63,32 +139,75 @@ class MockAPIClient:
             logging.error(f"MockAPI error fetching reply {message_id}: {e}")
             return {"reply": None, "timestamp": None}
 
+    async def _post_bulk_async(self, client: httpx.AsyncClient, path: str, ids: List[str], fallback) -> Dict:
+        try:
+            r = await client.post(path, json=ids)
+            r.raise_for_status()
+            return r.json()
+        except Exception as e:
+            logging.error(f"MockAPI error on {path} for {len(ids)} ids: {e}")
+            return {mid: fallback for mid in ids}
+
+    async def _poll_async(self, queued_ids: List[str], reply_ids: List[str]):
+        chunk = BULK_CHUNK_SIZE
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=10) as client:
+            status_calls = [
+                self._post_bulk_async(client, "/mock/status/bulk", queued_ids[i:i + chunk], "unknown")
+                for i in range(0, len(queued_ids), chunk)
+            ]
+            reply_calls = [
+                self._post_bulk_async(client, "/mock/reply/bulk", reply_ids[i:i + chunk], {"reply": None, "timestamp": None})
+                for i in range(0, len(reply_ids), chunk)
+            ]
+            # Status and reply chunks are all in flight at once
+            parts = await asyncio.gather(*status_calls, *reply_calls)
+
+        statuses, replies = {}, {}
+        for part in parts[:len(status_calls)]:
+            statuses.update(part)
+        for part in parts[len(status_calls):]:
+            replies.update(part)
+        return statuses, replies
+
+    def poll(self, queued_ids: List[str], reply_ids: List[str]):
+        # Used by the background monitor: returns (statuses, replies) for one tick
+        if not queued_ids and not reply_ids:
+            return {}, {}
+        return asyncio.run(self._poll_async(queued_ids, reply_ids))
+
+    def _send_one(self, lead: Dict, templates: List[str]) -> Dict:
+        try:
+            # format_map fills {name} (or any other lead column) straight from the lead dict
+            personalized = templates[random.randrange(len(templates))].format_map(lead)
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            res = self.send_message(lead["phone"], personalized)
+            res.update({
+                "name": lead["name"],
+                "phone": lead["phone"],
+                "message": personalized,
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            })
+            return res
+        except Exception as e:
+            logging.error(f"Error preparing lead {lead['name']}: {e}")
+            return {
+                "name": lead["name"],
+                "phone": lead["phone"],
+                "message": "",
+                "status": "failed",
+                "message_id": None,
+                "error": str(e),
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+
     def send_bulk_messages(self, leads_data: List[Dict], message_templates: Dict) -> List[Dict]:
-        results = []
-        for lead in leads_data:
-            try:
-                templates = message_templates.get(lead["interest_area"], message_templates.get("default", []))
-                import random
-                selected = random.choice(templates)
-                personalized = selected.format(name=lead["name"])
-                res = self.send_message(lead["phone"], personalized)
-                res.update({
-                    "name": lead["name"],
-                    "phone": lead["phone"],
-                    "message": personalized,
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-                })
-                results.append(res)
-                time.sleep(0.5)
-            except Exception as e:
-                logging.error(f"Error preparing lead {lead['name']}: {e}")
-                results.append({
-                    "name": lead["name"],
-                    "phone": lead["phone"],
-                    "message": "",
-                    "status": "failed",
-                    "message_id": None,
-                    "error": str(e),
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-                })
-        return results
+        # Resolve each lead's template pool once up front, then fan the sends out over a
+        # thread pool; results keep the order of leads_data
+        default = message_templates.get("default", [])
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            futures = [
+                ex.submit(self._send_one, lead, message_templates.get(lead.get("interest_area"), default))
+                for lead in leads_data
+            ]
+            return [f.result() for f in futures]
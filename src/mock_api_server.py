@@ -1,20 +1,106 @@
 import random
 import string
 import time
+import numpy as np
 from datetime import datetime
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 app = FastAPI(title="Mock WhatsApp API Server")
 
-# In‐memory storage of messages
-#   { message_id: { "to": "<phone>", "body": "<text>", "sent_at": <epoch>, "status": "queued"/"sent"/"failed", "reply_history": [...] } }
-MESSAGES: Dict[str, Dict] = {}
-
 # Phones for which replies are always suppressed
 SUPPRESS_REPLY_FOR = {"+919876543210", "+919876543211"} # I  did this to check if the follow‐up logic works correctly
 
+POSSIBLE_REPLIES = [
+    "I’m interested, please share more.",
+    "Can you tell me about costs?",
+    "Thank you, I’d like to apply.",
+    "Not now, maybe later."
+]
+
+
+# In‐memory storage of messages as parallel arrays (one row per message) so the bulk
+# endpoints resolve a whole batch with a few numpy ops instead of a dict per message
+class MessageStore:
+    def __init__(self, capacity=1024):
+        self.ids: Dict[str, int] = {}  # message_id -> row
+        self.size = 0
+        self.to = np.empty(capacity, dtype=object)
+        self.body = np.empty(capacity, dtype=object)
+        self.sent_at = np.zeros(capacity, dtype=np.float64)
+        self.status = np.empty(capacity, dtype=object)  # "queued"/"sent"/"failed"
+        self.suppressed = np.zeros(capacity, dtype=bool)
+        # Latest reply per row (None until the first one); full history kept alongside
+        self.reply_text = np.empty(capacity, dtype=object)
+        self.reply_ts = np.empty(capacity, dtype=object)
+        self.reply_history: List[List[Dict]] = []
+
+    def _grow(self):
+        # Double every array so appends stay amortised O(1)
+        cap = len(self.status) * 2
+        for name in ("to", "body", "sent_at", "status", "suppressed", "reply_text", "reply_ts"):
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype) if old.dtype != object else np.empty(cap, dtype=object)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, msg_id: str, to: str, body: str):
+        if self.size == len(self.status):
+            self._grow()
+        row = self.size
+        self.ids[msg_id] = row
+        self.to[row] = to
+        self.body[row] = body
+        self.sent_at[row] = time.time()
+        self.status[row] = "queued"
+        self.suppressed[row] = to in SUPPRESS_REPLY_FOR
+        self.reply_history.append([])
+        self.size += 1
+
+    def rows(self, ids: List[str]) -> np.ndarray:
+        # Row for each id, -1 for unknown ones
+        return np.fromiter((self.ids.get(mid, -1) for mid in ids), dtype=np.int64, count=len(ids))
+
+    def resolve(self, rows: np.ndarray) -> np.ndarray:
+        # A queued message settles on first poll: 70% "sent", 30% "failed"
+        known = rows[rows >= 0]
+        queued = np.unique(known[self.status[known] == "queued"])
+        if len(queued):
+            flips = np.random.random(len(queued)) < 0.7
+            self.status[queued] = np.where(flips, "sent", "failed")
+        out = np.full(len(rows), "unknown", dtype=object)
+        out[rows >= 0] = self.status[known]
+        return out
+
+    def replies(self, rows: np.ndarray):
+        # Returns (reply, timestamp) arrays; None where there is no reply
+        known = rows >= 0
+        safe = np.where(known, rows, 0)
+
+        # Suppressed phones never reply (to check follow‐up logic); otherwise a "sent" message
+        # without a reply gets one 30% of the time (to simulate user engagement)
+        eligible = known & ~self.suppressed[safe] & (self.status[safe] == "sent")
+        fresh = np.unique(rows[eligible & np.equal(self.reply_text[safe], None)])
+        if len(fresh):
+            fresh = fresh[np.random.random(len(fresh)) < 0.3]
+            ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            chosen = np.asarray(POSSIBLE_REPLIES, dtype=object)[np.random.randint(len(POSSIBLE_REPLIES), size=len(fresh))]
+            self.reply_text[fresh] = chosen
+            self.reply_ts[fresh] = ts
+            for row, text in zip(fresh.tolist(), chosen.tolist()):
+                self.reply_history[row].append({"text": text, "timestamp": ts})
+
+        # If already has a reply, return the latest one
+        text = np.full(len(rows), None, dtype=object)
+        stamp = np.full(len(rows), None, dtype=object)
+        text[eligible] = self.reply_text[rows[eligible]]
+        stamp[eligible] = self.reply_ts[rows[eligible]]
+        return text, stamp
+
+
+MESSAGES = MessageStore()
+
 
 def _generate_message_id() -> str:
     return "".join(random.choices(string.ascii_uppercase + string.digits, k=10))
@@ -44,60 +130,37 @@ class ReplyResponse(BaseModel):
 @app.post("/mock/send", response_model=SendResponse)
 async def mock_send(req: SendRequest):
     msg_id = _generate_message_id()
-    now_epoch = time.time()
-    MESSAGES[msg_id] = {
-        "to": req.to,
-        "body": req.body,
-        "sent_at": now_epoch,
-        "status": "queued",
-        "reply_history": []
-    }
+    MESSAGES.add(msg_id, req.to, req.body)
     return SendResponse(message_id=msg_id, status="queued")
 
 
 @app.get("/mock/status/{message_id}", response_model=StatusResponse)
 async def mock_status(message_id: str):
 
-    if message_id not in MESSAGES:
+    if message_id not in MESSAGES.ids:
         raise HTTPException(status_code=404, detail="Message ID not found")
 
-    record = MESSAGES[message_id]
-    current_status = record["status"]
-    if current_status == "queued":
-        record["status"] = "sent" if random.random() < 0.7 else "failed"
-    return StatusResponse(message_id=message_id, status=record["status"])
+    status = MESSAGES.resolve(MESSAGES.rows([message_id]))[0]
+    return StatusResponse(message_id=message_id, status=status)
+
+
+@app.post("/mock/status/bulk")
+async def mock_status_bulk(ids: List[str]) -> Dict[str, str]:
+    # Unknown IDs map to "unknown" rather than failing the whole batch
+    return dict(zip(ids, MESSAGES.resolve(MESSAGES.rows(ids)).tolist()))
 
 
 @app.get("/mock/reply/{message_id}", response_model=ReplyResponse)
 async def mock_reply(message_id: str):
 
-    if message_id not in MESSAGES:
+    if message_id not in MESSAGES.ids:
         raise HTTPException(status_code=404, detail="Message ID not found")
 
-    record = MESSAGES[message_id]
-    phone = record["to"]
-
-    # If this phone is in the suppress list, always return no reply (to check follow‐up logic)
-    if phone in SUPPRESS_REPLY_FOR:
-        return ReplyResponse(message_id=message_id, reply=None, timestamp=None)
-
-    # If already has a reply, return it (randomly choosing the latest one)
-    if record["reply_history"]:
-        latest = record["reply_history"][-1]
-        return ReplyResponse(message_id=message_id, reply=latest["text"], timestamp=latest["timestamp"])
-
-    # Otherwise, randomly decide (30% chance) to reply if status is "sent" (to simulate user engagement)
-    if record["status"] == "sent" and random.random() < 0.3:
-        possible_replies = [
-            "I’m interested, please share more.",
-            "Can you tell me about costs?",
-            "Thank you, I’d like to apply.",
-            "Not now, maybe later."
-        ]
-        chosen = random.choice(possible_replies)
-        ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-        record["reply_history"].append({"text": chosen, "timestamp": ts})
-        return ReplyResponse(message_id=message_id, reply=chosen, timestamp=ts)
-
-    # No reply yet
-    return ReplyResponse(message_id=message_id, reply=None, timestamp=None)
+    text, stamp = MESSAGES.replies(MESSAGES.rows([message_id]))
+    return ReplyResponse(message_id=message_id, reply=text[0], timestamp=stamp[0])
+
+
+@app.post("/mock/reply/bulk")
+async def mock_reply_bulk(ids: List[str]) -> Dict[str, Dict]:
+    text, stamp = MESSAGES.replies(MESSAGES.rows(ids))
+    return {mid: {"reply": t, "timestamp": ts} for mid, t, ts in zip(ids, text.tolist(), stamp.tolist())}
@@ -0,0 +1,124 @@
+import os
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import pandas as pd
+
+from logger import ExcelLogger
+
+
+def _results(n, start=0):
+    sent = (datetime.now() - timedelta(minutes=20)).strftime("%Y-%m-%d %H:%M:%S")
+    return [
+        {"name": f"Lead {i}", "phone": f"+9100000000{i}", "message": "hi",
+         "status": "queued", "message_id": f"MID{i}", "timestamp": sent}
+        for i in range(start, start + n)
+    ]
+
+
+def _logger(tmp_path):
+    # Long compact interval so only the test decides when the parquet file is written
+    return ExcelLogger(str(tmp_path / "delivery_log.parquet"), compact_interval=3600)
+
+
+def test_wal_replays_after_crash(tmp_path):
+    log = _logger(tmp_path)
+    log.log_message_batch(_results(3))
+    log.update_delivery_status("MID0", "sent")
+    log.update_reply_status("MID1", "Interested", "2024-01-01 10:00:00")
+    expected = log.get_current_data()
+
+    # No compaction happened: a fresh logger has to rebuild everything from the WAL
+    restarted = _logger(tmp_path)
+    pd.testing.assert_frame_equal(restarted.get_current_data(), expected)
+    assert restarted.update_delivery_status("MID2", "failed")
+
+
+def test_wal_records_already_compacted_are_not_replayed(tmp_path):
+    log = _logger(tmp_path)
+    log.log_message_batch(_results(2))
+    log.update_delivery_status("MID0", "sent")
+    # Crash between writing the parquet file and truncating the WAL
+    log._write_to_disk(log._df, seq=log._seq)
+    expected = log.get_current_data()
+
+    restarted = _logger(tmp_path)
+    pd.testing.assert_frame_equal(restarted.get_current_data(), expected)
+
+
+def test_new_log_ignores_wal_of_deleted_log(tmp_path):
+    log = _logger(tmp_path)
+    log.log_message_batch(_results(3))
+    log.update_delivery_status("MID0", "sent")
+    os.remove(log.log_file_path)
+
+    fresh = _logger(tmp_path)
+    assert fresh.get_current_data().empty
+    fresh.log_message_batch(_results(1, start=10))
+
+    restarted = _logger(tmp_path)
+    data = restarted.get_current_data()
+    assert data["Message_ID"].tolist() == ["MID10"]
+    assert data["Delivery_Status"].tolist() == ["queued"]
+
+
+class ArchivingAPI:
+    # Archives a finished row while the retry sends are in flight, shifting every row up by one
+    def __init__(self, log):
+        self.log = log
+
+    def send_messages(self, phones, messages):
+        self.log.archive_old_rows(datetime.now() + timedelta(days=2))
+        return [{"status": "queued", "message_id": f"NEW-{phone}"} for phone in phones]
+
+
+def test_retry_results_follow_rows_without_message_id(tmp_path):
+    log = _logger(tmp_path)
+    finished = _results(1)
+    finished[0]["status"] = "sent"
+    failed = [dict(r, status="failed", message_id=None) for r in _results(3, start=1)]
+    log.log_message_batch(finished + failed)
+    log.update_reply_status("MID0", "Thanks", "2024-01-01 10:00:00")
+
+    log.retry_failed_messages(ArchivingAPI(log), datetime.now())
+
+    data = log.get_current_data()
+    assert len(data) == 3
+    assert data["Message_ID"].tolist() == [f"NEW-{phone}" for phone in data["Phone"]]
+    assert data["Delivery_Status"].tolist() == ["queued"] * 3
+    assert data["Retry_Count"].tolist() == [1, 1, 1]
+
+
+def test_wal_torn_tail_does_not_swallow_later_records(tmp_path):
+    log = _logger(tmp_path)
+    log.log_message_batch(_results(2))
+    log.update_delivery_status("MID0", "sent")
+    # Crash halfway through writing the last record
+    with open(log.wal_path, "r+b") as f:
+        f.truncate(os.path.getsize(log.wal_path) - 10)
+
+    recovered = _logger(tmp_path)
+    assert recovered.get_current_data()["Delivery_Status"].tolist() == ["queued", "queued"]
+    assert recovered.update_delivery_status("MID1", "failed")
+
+    restarted = _logger(tmp_path)
+    assert restarted.get_current_data()["Delivery_Status"].tolist() == ["queued", "failed"]
+
+
+def test_empty_batch_is_a_no_op(tmp_path):
+    log = _logger(tmp_path)
+    assert log.log_message_batch([])
+    assert log.get_current_data().empty
+    assert os.path.getsize(log.wal_path) == 0
+
+
+def test_excel_export_includes_whole_archive(tmp_path):
+    log = _logger(tmp_path)
+    log.log_message_batch(_results(1))
+    old = log.get_current_data().assign(Message_ID="OLD0")
+    os.makedirs(log.archive_dir, exist_ok=True)
+    old.to_parquet(os.path.join(log.archive_dir, "20000101.parquet"), engine="pyarrow")
+
+    assert log.get_current_data(include_archive=True)["Message_ID"].tolist() == ["MID0"]
+    exported = pd.read_excel(BytesIO(log.to_excel_bytes()))
+    assert sorted(exported["Message_ID"]) == ["MID0", "OLD0"]